@@ -1017,7 +1017,9 @@ If you encounter any issues, call `authenticate_google_workspace()` to check you
             result = (
                 sheets_service.spreadsheets()
                 .values()
-                .get(spreadsheetId=spreadsheet_id, range=range_name)
+                .get(
+                    spreadsheetId=spreadsheet_id, range=range_name, fields="values"
+                )
                 .execute()
             )
 
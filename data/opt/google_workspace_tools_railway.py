@@ -10,17 +10,417 @@ version: 3.0.0
 licence: MIT
 """
 
+import base64
+import contextlib
+import datetime
+import functools
 import json
+import logging
 import os
+import pathlib
+import queue
 import re
+import sqlite3
+import tempfile
+import threading
+import time
+import types
 import urllib.parse
-from typing import List, Optional
+from email.message import EmailMessage
+from typing import Dict, List, Optional
 
 import requests
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaInMemoryUpload, build_http
 from pydantic import BaseModel, Field
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib json module is the fallback
+    orjson = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:  # optional speedup; _HTML_TAG_RE strips tags without it
+    HTMLParser = None
+
+logger = logging.getLogger("google_workspace_tools")
+
+_MODULE_DIR = pathlib.Path(__file__).resolve().parent
+# Diagnostics stay quiet unless GOOGLE_TOOLS_LOG_LEVEL (e.g. DEBUG) asks for them
+logger.setLevel(
+    logging.getLevelNamesMapping().get(
+        os.environ.get("GOOGLE_TOOLS_LOG_LEVEL", "WARNING").upper(), logging.WARNING
+    )
+)
+
+# Google endpoints and request constants shared across the tool methods
+_OAUTH_AUTH_URL = "https://accounts.google.com/o/oauth2/auth"
+_OAUTH_TOKEN_URL = "https://oauth2.googleapis.com/token"
+_OAUTH_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+_OAUTH_DEFAULTS = types.MappingProxyType(
+    {
+        "auth_uri": _OAUTH_AUTH_URL,
+        "token_uri": _OAUTH_TOKEN_URL,
+        "auth_provider_x509_cert_url": _OAUTH_CERTS_URL,
+    }
+)
+_FORM_EDIT_URL_TPL = "https://docs.google.com/forms/d/{}/edit"
+_DOC_EDIT_URL_TPL = "https://docs.google.com/document/d/{}/edit"
+# Drive listings never paginate, so nextPageToken is not requested
+_DRIVE_FILE_FIELDS = "files(id, name, mimeType, modifiedTime, webViewLink)"
+_DOC_TEXT_FIELDS = "body(content(paragraph(elements(textRun(content)))))"
+# Raw Drive query syntax is passed through untouched by search_google_drive
+_MIME_RE = re.compile(r"mimeType", re.I)
+
+# Words handle_user_message routes on, matched anywhere as in a substring test
+_ROUTE_KEYWORDS_RE = re.compile(
+    r"drive|files|documents|proposal|show|list|search|find", re.I
+)
+
+# OAuth codes pasted back from the callback page: a labelled code, or a bare 4/...
+_OAUTH_RE = re.compile(
+    r"(?:Complete authentication with code:|Authorization code:|Code:)"
+    r"\s*([0-9A-Za-z\-_/]+)"
+    r"|4/[0-9A-Za-z\-_]+"
+)
+
+# Exact prompts (stripped, lower-cased) routed straight to a zero-argument method
+_FAST_PATHS = types.MappingProxyType(
+    {
+        "show my drive": "show_my_drive_files",
+        "show my files": "show_my_drive_files",
+        "show my drive files": "show_my_drive_files",
+        "list my drive": "show_my_drive_files",
+        "list my files": "show_my_drive_files",
+        "list my drive files": "show_my_drive_files",
+    }
+)
+_FAST_PATH_MAX_LEN = 32
+
+# Natural-language Drive searches in priority order: (pattern with query, file type)
+_NL_SEARCH_RULES = (
+    (r"find[^\n]{0,64}?(?:google docs?|documents?)\s+(?:with\s+)?(.+)", "document"),
+    (
+        r"find[^\n]{0,64}?(?:google sheets?|spreadsheets?)\s+(?:with\s+)?(.+)",
+        "spreadsheet",
+    ),
+    (
+        r"find[^\n]{0,64}?(?:google slides?|presentations?)\s+(?:with\s+)?(.+)",
+        "presentation",
+    ),
+    (r"find[^\n]{0,64}?(?:pdf|pdfs)\s+(?:with\s+)?(.+)", "pdf"),
+    (r"find[^\n]{0,64}?(?:files?|docs?)\s+(?:with\s+)?(.+)", None),
+    (r"search(?:[^\n]{0,64}?\sfor\s+|\s*)(.+)", None),
+    (r"show(?:[^\n]{0,64}?\sme\s+|\s*)(.+)", None),
+)
+# One anchored pass: a lookahead takes the first number as the result count, then
+# the rules are tried in order, each free to start anywhere as re.search would
+_NL_SEARCH_RE = re.compile(
+    r"^(?:(?=(?s:.*?)(?P<count>\d+)))?(?:"
+    + "|".join(
+        "(?s:.*?)" + pattern.replace("(.+)", f"(?P<q{i}>.+)")
+        for i, (pattern, _) in enumerate(_NL_SEARCH_RULES)
+    )
+    + ")?",
+    re.I,
+)
+_NL_SEARCH_TYPES = {
+    f"q{i}": file_type for i, (_, file_type) in enumerate(_NL_SEARCH_RULES)
+}
+_FULLTEXT_TRIGGERS_RE = re.compile(r"\b(?:content|inside|text|body)\b", re.I)
+
+# Search file-type hints to Drive MIME types, and MIME types to display labels
+_MIME_MAP = types.MappingProxyType(
+    {
+        "document": "application/vnd.google-apps.document",
+        "spreadsheet": "application/vnd.google-apps.spreadsheet",
+        "presentation": "application/vnd.google-apps.presentation",
+        "pdf": "application/pdf",
+    }
+)
+_FRIENDLY_TYPE_MAP = types.MappingProxyType(
+    {
+        "application/vnd.google-apps.document": "📄 Google Doc",
+        "application/vnd.google-apps.spreadsheet": "📊 Google Sheet",
+        "application/vnd.google-apps.presentation": "🎯 Google Slides",
+        "application/pdf": "📑 PDF",
+        "application/vnd.google-apps.folder": "📁 Folder",
+    }
+)
+_STOPWORDS = frozenset(
+    {
+        "find",
+        "show",
+        "me",
+        "my",
+        "the",
+        "search",
+        "for",
+        "in",
+        "drive",
+        "google",
+        "docs",
+        "files",
+        "documents",
+    }
+)
+
+# Tags are stripped from the raw bytes, before the (shorter) text is decoded
+_HTML_TAG_RE = re.compile(rb"<[^>]+>")
+
+# search_my_drive replies are reused for identical searches this many seconds
+_SEARCH_CACHE_TTL = 30.0
+_SEARCH_CACHE_SIZE = 64
+
+# Replies of read-only tools are reused this many seconds, by kind of data
+_READ_CACHE_TTL = types.MappingProxyType(
+    {"doc": 300.0, "contacts": 600.0, "tasks": 60.0, "sites": 600.0}
+)
+_READ_CACHE_SIZE = 128
+
+# Each call in a Gmail batch counts against the per-user concurrency limit, so
+# batches stay at the documented 50, and smaller for full message bodies
+_GMAIL_BATCH_LIMIT = 50
+_GMAIL_FULL_BATCH_LIMIT = 10
+# Partial responses: message listings only need ids, and the metadata views
+# only read these three headers
+_GMAIL_LIST_FIELDS = "messages/id"
+_GMAIL_METADATA_HEADERS = ["Subject", "From", "Date"]
+_GMAIL_HEADER_FIELDS = "payload/headers"
+
+# Applied to every token-store connection; WAL lets readers run alongside writes
+_DB_READ_PRAGMAS = """
+    PRAGMA busy_timeout=5000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+"""
+_DB_PRAGMAS = (
+    """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+"""
+    + _DB_READ_PRAGMAS
+)
+_DB_READ_POOL_SIZE = os.cpu_count() or 4
+
+# Token-store statements, kept as constants so the statement cache always hits
+_CREATE_TOKEN_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS user_google_tokens (
+        user_id INTEGER PRIMARY KEY,
+        access_token TEXT,
+        refresh_token TEXT,
+        token_expiry INTEGER,
+        client_id TEXT,
+        client_secret TEXT,
+        scopes TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_ugt_token_expiry
+        ON user_google_tokens(token_expiry);
+"""
+_SELECT_TOKEN_SQL = (
+    "SELECT access_token, refresh_token, token_expiry, client_id, client_secret, scopes"
+    " FROM user_google_tokens WHERE user_id = ?"
+)
+_UPSERT_TOKEN_SQL = """
+    INSERT INTO user_google_tokens
+    (user_id, access_token, refresh_token, token_expiry, client_id, client_secret, scopes)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        access_token = excluded.access_token,
+        refresh_token = excluded.refresh_token,
+        token_expiry = excluded.token_expiry,
+        client_id = excluded.client_id,
+        client_secret = excluded.client_secret,
+        scopes = excluded.scopes,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Cached credentials are reused only while this far from expiry. It stays a
+# minute beyond google-auth's own refresh threshold (3m45s, REFRESH_THRESHOLD in
+# google.auth._helpers), so tokens are refreshed (and persisted) here before an
+# API transport would refresh them in place
+_CREDS_EXPIRY_SKEW = datetime.timedelta(minutes=4, seconds=45)
+# A user's token is not refreshed again sooner than this many seconds
+_REFRESH_MIN_INTERVAL = 30.0
+
+# The authorization code is single-use, so its exchange is retried only on
+# connection errors raised before the request is sent; a replayed exchange
+# would only turn the real failure into invalid_grant
+_HTTP_RETRY = Retry(total=5, connect=5, read=0, other=0, backoff_factor=0.3)
+# Refresh-token grants are safe to replay, so transient Google errors on them
+# are retried too, honouring Retry-After. The last response is handed back for
+# google-auth to report
+_REFRESH_HTTP_RETRY = Retry(
+    total=5,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=True,
+    allowed_methods=frozenset(["POST"]),
+    raise_on_status=False,
+)
+# Reads and idempotent Google API requests retry 429/5xx responses this many
+# times, with randomized exponential backoff, before raising HttpError. Batched
+# Gmail reads get the same retries by fetching throttled items again one by one.
+# Sends and creates run once: a retry after a timeout could duplicate them
+_API_NUM_RETRIES = 4
+
+# Keep-alive session for direct calls to Google's OAuth endpoints, shared by
+# every Tools instance so token exchanges and refreshes reuse TLS connections
+_HTTP = requests.Session()
+_HTTP.mount(
+    "https://",
+    HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_HTTP_RETRY),
+)
+# Session for token refreshes, the only OAuth calls that may be retried
+_REFRESH_HTTP = requests.Session()
+_REFRESH_HTTP.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16, pool_maxsize=32, max_retries=_REFRESH_HTTP_RETRY
+    ),
+)
+
+
+def _json_dumps(obj, compact: bool = False) -> str:
+    """Serialize obj as two-space indented (or compact) JSON, preferring orjson."""
+    if orjson is not None:
+        if compact:
+            return orjson.dumps(obj).decode()
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    if compact:
+        return json.dumps(obj, separators=(",", ":"))
+    return json.dumps(obj, indent=2)
+
+
+def _json_loads(data):
+    """Parse a JSON document, preferring orjson."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _expiry_to_epoch(expiry: datetime.datetime) -> int:
+    """Return a naive UTC expiry (as google-auth keeps it) as Unix seconds."""
+    return int(expiry.replace(tzinfo=datetime.timezone.utc).timestamp())
+
+
+def _token_row(creds, user_id=None, scopes: Optional[str] = None) -> tuple:
+    """Return the _UPSERT_TOKEN_SQL parameters for one user's credentials.
+
+    scopes, when given, is creds.scopes already joined by spaces.
+    """
+    if scopes is None and creds.scopes:
+        scopes = " ".join(creds.scopes)
+    return (
+        user_id or 1,  # Default to user_id 1 if not provided
+        creds.token,
+        creds.refresh_token,
+        _expiry_to_epoch(creds.expiry) if creds.expiry else None,
+        creds.client_id,
+        creds.client_secret,
+        scopes,
+    )
+
+
+def _drive_quote(term: str) -> str:
+    """Escape term for use inside a single-quoted Drive query string."""
+    return term.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _near_expiry(creds) -> bool:
+    """Return True when creds expire within _CREDS_EXPIRY_SKEW from now."""
+    if not creds.expiry:
+        return False
+    # google-auth keeps expiry as a naive UTC datetime
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    return creds.expiry - _CREDS_EXPIRY_SKEW <= now
+
+
+def _cell_data(value) -> dict:
+    """Convert a Python value to Sheets CellData, matching RAW value input."""
+    if value is None:
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+def _body_text(data: str, html: bool = False) -> str:
+    """Decode a base64url Gmail body, stripping tags first when it is HTML."""
+    raw = base64.urlsafe_b64decode(data)
+    if html:
+        if HTMLParser is not None:
+            return HTMLParser(raw).text(separator=" ")
+        raw = _HTML_TAG_RE.sub(b"", raw)
+    return raw.decode("utf-8")
+
+
+def _message_headers(headers: list) -> tuple:
+    """Return (subject, sender, date) from Gmail headers in a single scan."""
+    subject = sender = date = None
+    for header in headers:
+        name = header["name"]
+        if name == "Subject":
+            if subject is None:
+                subject = header["value"]
+        elif name == "From":
+            if sender is None:
+                sender = header["value"]
+        elif name == "Date":
+            if date is None:
+                date = header["value"]
+    return (
+        "No Subject" if subject is None else subject,
+        "Unknown Sender" if sender is None else sender,
+        "Unknown Date" if date is None else date,
+    )
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_nl_query(message: str) -> tuple:
+    """Parse a search request into (query, max_results, file_type)."""
+    query = None
+    file_type = None
+    max_results = 10
+
+    # Extract the number, query and file type in a single match
+    match = _NL_SEARCH_RE.match(message)
+    if match["count"]:
+        max_results = int(match["count"])
+    if match.lastgroup in _NL_SEARCH_TYPES:
+        query = match[match.lastgroup].strip()
+        file_type = _NL_SEARCH_TYPES[match.lastgroup]
+
+    # Default to simple keyword extraction if no pattern matched
+    if not query:
+        # Remove common words and extract the main search term
+        keywords = [w for w in message.split() if w.lower() not in _STOPWORDS]
+        query = " ".join(keywords) if keywords else "*"
+
+    # Build search query; full-text matching is much slower, so only on request
+    search_query = query
+    if file_type:
+        term = _drive_quote(query)
+        terms = f"name contains '{term}'"
+        if _FULLTEXT_TRIGGERS_RE.search(message):
+            terms += f" or fullText contains '{term}'"
+        if file_type in _MIME_MAP:
+            search_query = f"mimeType='{_MIME_MAP[file_type]}' and ({terms})"
+        else:
+            search_query = terms
+
+    return search_query, max_results, file_type
 
 
 class Tools:
@@ -33,15 +433,56 @@ class Tools:
         self.is_railway = bool(os.environ.get("RAILWAY_ENVIRONMENT"))
         self.railway_domain = os.environ.get("RAILWAY_PUBLIC_DOMAIN")
 
+        # Loaded credentials per user, reused until they are close to expiry
+        self._cached_creds: Dict[int, Credentials] = {}
+
+        # Credentials built from token rows: (user_id, token, expiry) -> Credentials
+        self._creds_by_row = {}
+
+        # Monotonic time of each user's last token refresh
+        self._last_refresh_at: Dict[int, float] = {}
+        self._creds_lock = threading.Lock()
+
+        # httplib2 transports are not thread-safe, so clients and transports are
+        # kept per worker thread. Both maps are guarded by _services_lock.
+        # Discovery-built clients: (api, version, user_id, thread) -> (creds, client)
+        self._services = {}
+        # Keep-alive authorized transports: (user_id, thread) -> (creds, http)
+        self._authed_http = {}
+        self._services_lock = threading.Lock()
+
+        # Space-joined scopes: (SCOPES list it was built from, value)
+        self._scope_string_cache = None
+
+        # Formatted search_my_drive replies: (query, max_results) -> (time, text)
+        self._search_cache = {}
+        self._search_cache_lock = threading.Lock()
+
+        # Formatted read-only tool replies: (kind, *args) -> (expires_at, text)
+        self._read_cache = {}
+        self._read_cache_lock = threading.Lock()
+
+        # Last calendar listing, revalidated with its ETag: (key, etag, response)
+        self._calendar_cache = None
+
         # Database-first approach for token storage
         self.use_database = True
         # Use existing webui.db for Railway, create test db locally
         if self.is_railway:
             self.db_path = os.environ.get("DATABASE_PATH", "/app/backend/data/webui.db")
         else:
-            self.db_path = os.path.join(
-                os.path.dirname(__file__), "..", "..", "webui.db"
-            )
+            self.db_path = str(_MODULE_DIR.parent.parent / "webui.db")
+
+        # Token store: one locked writer plus a lazily filled pool of readers
+        self._db_writer = None
+        self._db_write_lock = threading.Lock()
+        self._db_readers = queue.Queue()
+        self._db_reader_count = 0
+        self._db_pool_lock = threading.Lock()
+        self._schema_ready = False
+
+        # Token/credential directories are created at most once per instance
+        self._dirs_ensured = False
 
         # Fallback file paths (for backward compatibility)
         if self.is_railway:
@@ -58,6 +499,18 @@ class Tools:
             self.credentials_file = self.valves.GOOGLE_CREDENTIALS_FILE
             self.pending_oauth_file = f"{self.base_path}/pending_oauth.json"
 
+        # Distinct directories the fallback files live in, for _ensure_directories
+        self._storage_dirs = tuple(
+            dict.fromkeys(
+                os.path.dirname(path)
+                for path in (
+                    self.token_file,
+                    self.credentials_file,
+                    self.pending_oauth_file,
+                )
+            )
+        )
+
     def _get_redirect_uri(self) -> str:
         """Get the appropriate redirect URI, auto-detecting Railway environment."""
         # Railway detection
@@ -74,29 +527,36 @@ class Tools:
 
     def _ensure_directories(self) -> None:
         """Ensure all necessary directories exist for token storage."""
-        directories = [
-            os.path.dirname(self.token_file),
-            os.path.dirname(self.credentials_file),
-            os.path.dirname(self.pending_oauth_file),
-        ]
-
-        print(
-            f"🔍 Railway Debug - Environment: RAILWAY_ENVIRONMENT={os.environ.get('RAILWAY_ENVIRONMENT')}"
-        )
-        print("🔍 Railway Debug - Storage paths:")
-        print(f"  - Base path: {self.base_path}")
-        print(f"  - Token file: {self.token_file}")
-        print(f"  - Credentials file: {self.credentials_file}")
+        if self._dirs_ensured:
+            return
+
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(
+                "Railway Debug - Environment: RAILWAY_ENVIRONMENT=%s",
+                os.environ.get("RAILWAY_ENVIRONMENT"),
+            )
+            logger.debug(
+                "Railway Debug - Storage paths: base=%s token=%s credentials=%s",
+                self.base_path,
+                self.token_file,
+                self.credentials_file,
+            )
 
-        for directory in directories:
+        # Only remember success, so a failed makedirs is retried next time
+        ensured = True
+        for directory in self._storage_dirs:
             if directory and not os.path.exists(directory):
                 try:
                     os.makedirs(directory, exist_ok=True)
-                    print(f"✅ Created directory: {directory}")
+                    logger.debug("Created directory: %s", directory)
                 except Exception as e:
-                    print(f"❌ Failed to create directory {directory}: {e}")
-            else:
-                print(f"📁 Directory exists: {directory}")
+                    ensured = False
+                    logger.warning("Failed to create directory %s: %s", directory, e)
+            elif debug:
+                logger.debug("Directory exists: %s", directory)
+
+        self._dirs_ensured = ensured
 
     def _get_user_from_context(self):
         """
@@ -107,86 +567,140 @@ class Tools:
         # In a real Open WebUI integration, this would come from the framework
         return {"user_id": 1, "username": "default_user"}  # Placeholder
 
+    def _open_db(self, readonly: bool = False):
+        """Open the token database in autocommit mode with the tuning PRAGMAs."""
+        if readonly:
+            path = urllib.parse.quote(os.path.abspath(self.db_path))
+            conn = sqlite3.connect(
+                f"file:{path}?mode=ro",
+                uri=True,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256,
+            )
+            conn.executescript(_DB_READ_PRAGMAS)
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256,
+            )
+            # WAL needs a file on disk; an in-memory database only gets the tuning
+            in_memory = self.db_path == ":memory:"
+            conn.executescript(_DB_READ_PRAGMAS if in_memory else _DB_PRAGMAS)
+        return conn
+
+    @contextlib.contextmanager
+    def _db_write(self):
+        """Hold the single read-write connection for one transaction."""
+        with self._db_write_lock:
+            if self._db_writer is None:
+                self._db_writer = self._open_db()
+            if not self._schema_ready:
+                self._ensure_schema(self._db_writer)
+                self._schema_ready = True
+            with self._db_writer as conn:
+                yield conn
+
+    def _ensure_schema(self, conn) -> None:
+        """Create the token table and its indexes if they do not exist yet."""
+        conn.executescript(_CREATE_TOKEN_SCHEMA_SQL)
+
+    @contextlib.contextmanager
+    def _db_read(self):
+        """Borrow a read-only connection, opening one while the pool has room."""
+        if self.db_path == ":memory:":
+            # Each connection to ":memory:" is its own database, so share the writer
+            with self._db_write() as conn:
+                yield conn
+            return
+        try:
+            conn = self._db_readers.get_nowait()
+        except queue.Empty:
+            with self._db_pool_lock:
+                grow = self._db_reader_count < _DB_READ_POOL_SIZE
+                if grow:
+                    self._db_reader_count += 1
+            if not grow:
+                conn = self._db_readers.get()
+            else:
+                try:
+                    conn = self._open_db(readonly=True)
+                except Exception:
+                    with self._db_pool_lock:
+                        self._db_reader_count -= 1
+                    raise
+        try:
+            yield conn
+        finally:
+            self._db_readers.put(conn)
+
     def _save_credentials_to_db(self, creds, user_id=None):
         """Save credentials to database instead of file."""
         if not self.use_database:
             return self._save_credentials_to_file(creds)
 
-        print(f"💾 Saving credentials to database for user {user_id}")
+        logger.debug("Saving credentials to database for user %s", user_id)
 
-        try:
-            import sqlite3
+        # Rows about to be replaced must not resolve to their old Credentials
+        with self._creds_lock:
+            for key in [key for key in self._creds_by_row if key[0] == (user_id or 1)]:
+                del self._creds_by_row[key]
 
-            with sqlite3.connect(self.db_path) as conn:
+        try:
+            with self._db_write() as conn:
                 cursor = conn.cursor()
+                # Take the write lock up front so the upgrade cannot hit SQLITE_BUSY
+                cursor.execute("BEGIN IMMEDIATE")
 
-                # Create table if it doesn't exist (simplified approach)
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS user_google_tokens (
-                        user_id INTEGER PRIMARY KEY,
-                        access_token TEXT,
-                        refresh_token TEXT,
-                        token_expiry DATETIME,
-                        client_id TEXT,
-                        client_secret TEXT,
-                        scopes TEXT,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                # Insert or update user's tokens
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO user_google_tokens 
-                    (user_id, access_token, refresh_token, token_expiry, client_id, client_secret, scopes, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                """,
-                    (
-                        user_id or 1,  # Default to user_id 1 if not provided
-                        creds.token,
-                        creds.refresh_token,
-                        creds.expiry.isoformat() if creds.expiry else None,
-                        creds.client_id,
-                        creds.client_secret,
-                        json.dumps(creds.scopes) if creds.scopes else None,
-                    ),
+                # Insert or update user's tokens, reusing the joined valve scopes
+                scopes = (
+                    self._scope_string() if creds.scopes is self.valves.SCOPES else None
                 )
+                cursor.execute(_UPSERT_TOKEN_SQL, _token_row(creds, user_id, scopes))
 
                 conn.commit()
-                print(f"✅ Credentials saved to database for user {user_id or 1}")
+                logger.debug("Credentials saved to database for user %s", user_id or 1)
 
         except Exception as e:
-            print(f"❌ Failed to save credentials to database: {e}")
+            logger.warning("Failed to save credentials to database: %s", e)
             # Fallback to file storage
             self._save_credentials_to_file(creds)
 
+    def _save_many_credentials_to_db(self, creds_by_user: dict) -> None:
+        """Save several users' credentials in one transaction."""
+        with self._creds_lock:
+            for key in [key for key in self._creds_by_row if key[0] in creds_by_user]:
+                del self._creds_by_row[key]
+        with self._db_write() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                _UPSERT_TOKEN_SQL,
+                [
+                    _token_row(creds, user_id)
+                    for user_id, creds in creds_by_user.items()
+                ],
+            )
+        logger.debug("Credentials saved to database for %d users", len(creds_by_user))
+
     def _load_credentials_from_db(self, user_id=None):
         """Load credentials from database instead of file."""
         if not self.use_database:
             return self._load_credentials_from_file()
 
-        print(f"🔍 Loading credentials from database for user {user_id}")
+        logger.debug("Loading credentials from database for user %s", user_id)
 
         try:
-            import sqlite3
-
-            with sqlite3.connect(self.db_path) as conn:
+            with self._db_read() as conn:
                 cursor = conn.cursor()
 
-                cursor.execute(
-                    """
-                    SELECT access_token, refresh_token, token_expiry, client_id, client_secret, scopes
-                    FROM user_google_tokens 
-                    WHERE user_id = ?
-                """,
-                    (user_id or 1,),
-                )
+                cursor.execute(_SELECT_TOKEN_SQL, (user_id or 1,))
 
                 row = cursor.fetchone()
                 if not row:
-                    print(
-                        f"❌ No credentials found in database for user {user_id or 1}"
+                    logger.debug(
+                        "No credentials found in database for user %s", user_id or 1
                     )
                     return None
 
@@ -199,38 +713,56 @@ class Tools:
                     scopes,
                 ) = row
 
-                # Parse expiry
-                expiry = None
-                if token_expiry:
-                    from datetime import datetime
-
-                    expiry = datetime.fromisoformat(token_expiry)
+                # An unchanged row yields the same object, so cached clients stay valid
+                row_key = (user_id or 1, access_token, token_expiry)
+                with self._creds_lock:
+                    creds = self._creds_by_row.get(row_key)
+                if creds is not None:
+                    return creds
 
-                # Parse scopes
-                parsed_scopes = json.loads(scopes) if scopes else self.valves.SCOPES
+                # Parse expiry (Unix seconds; rows saved before that are ISO text)
+                expiry = None
+                if isinstance(token_expiry, str):
+                    expiry = datetime.datetime.fromisoformat(token_expiry)
+                elif token_expiry:
+                    expiry = datetime.datetime.fromtimestamp(
+                        token_expiry, datetime.timezone.utc
+                    ).replace(tzinfo=None)
+
+                # Parse scopes (space-separated; rows saved before that are JSON)
+                if not scopes:
+                    parsed_scopes = self.valves.SCOPES
+                elif scopes.startswith("["):
+                    parsed_scopes = _json_loads(scopes)
+                else:
+                    parsed_scopes = scopes.split()
 
                 # Create credentials
                 creds = Credentials(
                     token=access_token,
                     refresh_token=refresh_token,
-                    token_uri="https://oauth2.googleapis.com/token",
+                    token_uri=_OAUTH_TOKEN_URL,
                     client_id=client_id,
                     client_secret=client_secret,
                     scopes=parsed_scopes,
                     expiry=expiry,
                 )
+                with self._creds_lock:
+                    self._creds_by_row[row_key] = creds
 
-                print(f"✅ Credentials loaded from database for user {user_id or 1}")
+                logger.debug(
+                    "Credentials loaded from database for user %s", user_id or 1
+                )
                 return creds
 
         except Exception as e:
-            print(f"❌ Failed to load credentials from database: {e}")
+            logger.warning("Failed to load credentials from database: %s", e)
             # Fallback to file storage
             return self._load_credentials_from_file()
 
     def _save_credentials_to_file(self, creds):
         """Fallback method: Save credentials to file."""
-        print(f"💾 Saving credentials to file: {self.token_file}")
+        logger.debug("Saving credentials to file: %s", self.token_file)
 
         token_data = {
             "token": creds.token,
@@ -243,34 +775,51 @@ class Tools:
 
         try:
             self._ensure_directories()
-            with open(self.token_file, "w") as f:
-                json.dump(token_data, f, indent=2)
-            print(f"✅ Credentials saved successfully to {self.token_file}")
+            # Write beside the target and swap it in, so a crash never truncates it.
+            # Each save gets its own temp file, as threads may save concurrently
+            fd, tmp_file = tempfile.mkstemp(
+                dir=os.path.dirname(self.token_file) or ".",
+                prefix=os.path.basename(self.token_file) + ".",
+                suffix=".tmp",
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(_json_dumps(token_data))
+                    # Railway's volume is the only copy worth paying an fsync for
+                    if self.is_railway:
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(tmp_file, self.token_file)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_file)
+                raise
+            logger.debug("Credentials saved to %s", self.token_file)
         except Exception as e:
-            print(f"❌ Failed to save credentials: {e}")
+            logger.warning("Failed to save credentials to file: %s", e)
             raise
 
     def _load_credentials_from_file(self):
         """Fallback method: Load credentials from file."""
-        print(f"🔍 Loading credentials from file: {self.token_file}")
+        logger.debug("Loading credentials from file: %s", self.token_file)
         self._ensure_directories()
 
         # Check if token file exists
         if not os.path.exists(self.token_file):
-            print(f"❌ Token file does not exist: {self.token_file}")
+            logger.debug("Token file does not exist: %s", self.token_file)
             return None
 
         try:
             # Load token data
             with open(self.token_file, "r") as f:
-                token_data = json.load(f)
-            print("✅ Token file loaded successfully")
+                token_data = _json_loads(f.read())
+            logger.debug("Token file loaded")
 
             # Ensure we have required fields
             required_fields = ["token", "refresh_token", "client_id", "client_secret"]
             if not all(field in token_data for field in required_fields):
-                print(
-                    f"❌ Missing required token fields. Found: {list(token_data.keys())}"
+                logger.warning(
+                    "Missing required token fields. Found: %s", list(token_data)
                 )
                 return None
 
@@ -278,29 +827,29 @@ class Tools:
             creds = Credentials(
                 token=token_data["token"],
                 refresh_token=token_data["refresh_token"],
-                token_uri=token_data.get(
-                    "token_uri", "https://oauth2.googleapis.com/token"
-                ),
+                token_uri=token_data.get("token_uri", _OAUTH_TOKEN_URL),
                 client_id=token_data["client_id"],
                 client_secret=token_data["client_secret"],
                 scopes=token_data.get("scopes", self.valves.SCOPES),
             )
 
             # Check if token needs refresh
-            if creds.expired and creds.refresh_token:
+            if creds.refresh_token and _near_expiry(creds):
                 try:
-                    creds.refresh(Request())
-                    # Save refreshed token
-                    self._save_credentials_to_file(creds)
-                    print("Token refreshed successfully")
+                    old_state = (creds.token, creds.expiry)
+                    creds.refresh(Request(session=_REFRESH_HTTP))
+                    # Save unless Google handed back the same token and expiry
+                    if (creds.token, creds.expiry) != old_state:
+                        self._save_credentials_to_file(creds)
+                    logger.debug("Token refreshed successfully")
                 except Exception as e:
-                    print(f"Token refresh failed: {e}")
+                    logger.warning("Token refresh failed: %s", e)
                     return None
 
             return creds
 
         except Exception as e:
-            print(f"Error loading credentials: {e}")
+            logger.warning("Error loading credentials from file: %s", e)
             return None
 
     def _get_oauth_credentials(self) -> dict:
@@ -320,9 +869,7 @@ class Tools:
                 "client_id": client_id,
                 "client_secret": client_secret,
                 "project_id": project_id or "default",
-                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
-                "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+                **_OAUTH_DEFAULTS,
             }
 
         # Priority 2: File-based credentials
@@ -333,23 +880,21 @@ class Tools:
                     "client_id": client_id,
                     "client_secret": client_secret,
                     "project_id": project_id or "default",
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
-                    "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+                    **_OAUTH_DEFAULTS,
                     "redirect_uris": [self._get_redirect_uri()],
                 }
             }
 
             self._ensure_directories()
             with open(self.credentials_file, "w") as f:
-                json.dump(credentials_data, f, indent=2)
+                f.write(_json_dumps(credentials_data))
 
             return credentials_data["web"]
 
         # Priority 3: Load from existing credentials file
         try:
             with open(self.credentials_file, "r") as f:
-                credentials = json.load(f)
+                credentials = _json_loads(f.read())
 
             # Handle both "installed" and "web" credential formats
             if "installed" in credentials:
@@ -359,20 +904,16 @@ class Tools:
             else:
                 raise ValueError("Invalid credentials format")
 
+            # Endpoint URLs from the file win over the defaults when present
             return {
                 "client_id": cred_data["client_id"],
                 "client_secret": cred_data["client_secret"],
                 "project_id": cred_data.get("project_id", "default"),
-                "auth_uri": cred_data.get(
-                    "auth_uri", "https://accounts.google.com/o/oauth2/auth"
-                ),
-                "token_uri": cred_data.get(
-                    "token_uri", "https://oauth2.googleapis.com/token"
-                ),
-                "auth_provider_x509_cert_url": cred_data.get(
-                    "auth_provider_x509_cert_url",
-                    "https://www.googleapis.com/oauth2/v1/certs",
-                ),
+                **_OAUTH_DEFAULTS,
+                **{
+                    key: cred_data[key]
+                    for key in _OAUTH_DEFAULTS.keys() & cred_data.keys()
+                },
             }
 
         except Exception as e:
@@ -504,43 +1045,119 @@ class Tools:
         user_context = self._get_user_from_context()
         user_id = user_context.get("user_id", 1)
 
-        print(f"🔍 Loading credentials for user {user_id}")
+        with self._creds_lock:
+            cached = self._cached_creds.get(user_id)
+        if cached is not None and cached.expiry and not _near_expiry(cached):
+            return cached
+
+        logger.debug("Loading credentials for user %s", user_id)
 
         # Try database first, fallback to file
         try:
             creds = self._load_credentials_from_db(user_id)
             if creds:
-                # Check if token needs refresh
-                if creds.expired and creds.refresh_token:
+                # Refresh only close to expiry, and not again right after a refresh
+                if (
+                    creds.refresh_token
+                    and _near_expiry(creds)
+                    and self._claim_refresh(user_id)
+                ):
                     try:
-                        creds.refresh(Request())
-                        # Save refreshed token
-                        self._save_credentials(creds)
-                        print("Token refreshed successfully")
+                        old_state = (creds.token, creds.expiry)
+                        creds.refresh(Request(session=_REFRESH_HTTP))
+                        # Save unless Google handed back the same token and expiry
+                        if (creds.token, creds.expiry) != old_state:
+                            self._save_credentials(creds)
+                        logger.debug("Token refreshed successfully")
                     except Exception as e:
-                        print(f"Token refresh failed: {e}")
+                        logger.warning("Token refresh failed: %s", e)
+                        with self._creds_lock:
+                            self._cached_creds.pop(user_id, None)
                         return None
+                with self._creds_lock:
+                    self._cached_creds[user_id] = creds
                 return creds
         except Exception as e:
-            print(f"❌ Database load failed, falling back to file: {e}")
+            logger.warning("Database load failed, falling back to file: %s", e)
 
         # Fallback to file-based loading
         return self._load_credentials_from_file()
 
+    def _claim_refresh(self, user_id) -> bool:
+        """Record a token refresh for user_id unless one happened very recently."""
+        now = time.monotonic()
+        with self._creds_lock:
+            last_refresh = self._last_refresh_at.get(user_id)
+            if last_refresh is not None and now - last_refresh < _REFRESH_MIN_INTERVAL:
+                return False
+            self._last_refresh_at[user_id] = now
+        return True
+
+    def _service(self, creds, name: str, version: str):
+        """Return this thread's API client for the user, rebuilt on new creds."""
+        user_id = self._get_user_from_context().get("user_id", 1)
+        thread_id = threading.get_ident()
+        key = (name, version, user_id, thread_id)
+        with self._services_lock:
+            cached = self._services.get(key)
+            if cached is not None and cached[0] is creds:
+                return cached[1]
+
+            # A user's clients on one thread share a transport and its connections
+            authed = self._authed_http.get((user_id, thread_id))
+            if authed is None or authed[0] is not creds:
+                authed = self._authed_http[(user_id, thread_id)] = (
+                    creds,
+                    AuthorizedHttp(creds, http=build_http()),
+                )
+
+        service = build(
+            name,
+            version,
+            http=authed[1],
+            cache_discovery=False,
+            static_discovery=True,
+        )
+        with self._services_lock:
+            self._services[key] = (creds, service)
+        return service
+
     def _save_credentials(self, creds):
         """Save credentials using database-first approach."""
         user_context = self._get_user_from_context()
         user_id = user_context.get("user_id", 1)
 
-        print(f"💾 Saving credentials for user {user_id}")
+        # This user's clients were built around the previous token
+        with self._services_lock:
+            for key in [key for key in self._services if key[2] == user_id]:
+                del self._services[key]
+            for key in [key for key in self._authed_http if key[0] == user_id]:
+                del self._authed_http[key]
+        with self._search_cache_lock:
+            self._search_cache.clear()
+        with self._read_cache_lock:
+            self._read_cache.clear()
+
+        with self._creds_lock:
+            self._cached_creds[user_id] = creds
+
+        logger.debug("Saving credentials for user %s", user_id)
 
         # Try database first, fallback to file
         try:
             self._save_credentials_to_db(creds, user_id)
         except Exception as e:
-            print(f"❌ Database save failed, falling back to file: {e}")
+            logger.warning("Database save failed, falling back to file: %s", e)
             self._save_credentials_to_file(creds)
 
+    def _scope_string(self) -> str:
+        """Return the space-joined scope list, rebuilt only when the valve changes."""
+        scopes = self.valves.SCOPES
+        cached = self._scope_string_cache
+        if cached is None or cached[0] is not scopes:
+            cached = self._scope_string_cache = (scopes, " ".join(scopes))
+        return cached[1]
+
     def get_oauth_authorization_url(self) -> str:
         """Generate Google OAuth authorization URL."""
         try:
@@ -548,17 +1165,16 @@ class Tools:
             client_id = credentials["client_id"]
             redirect_uri = self._get_redirect_uri()
 
-            scope_string = urllib.parse.quote(" ".join(self.valves.SCOPES))
-            encoded_redirect = urllib.parse.quote(redirect_uri)
-
-            auth_url = (
-                f"https://accounts.google.com/o/oauth2/auth?"
-                f"client_id={client_id}&"
-                f"redirect_uri={encoded_redirect}&"
-                f"scope={scope_string}&"
-                f"response_type=code&"
-                f"access_type=offline&"
-                f"prompt=consent"
+            auth_url = f"{_OAUTH_AUTH_URL}?" + urllib.parse.urlencode(
+                {
+                    "client_id": client_id,
+                    "redirect_uri": redirect_uri,
+                    "scope": self._scope_string(),
+                    "response_type": "code",
+                    "access_type": "offline",
+                    "prompt": "consent",
+                },
+                quote_via=urllib.parse.quote,
             )
 
             return (
@@ -585,9 +1201,7 @@ class Tools:
                 "redirect_uri": self._get_redirect_uri(),
             }
 
-            response = requests.post(
-                "https://oauth2.googleapis.com/token", data=token_data, timeout=30
-            )
+            response = _HTTP.post(_OAUTH_TOKEN_URL, data=token_data, timeout=30)
             response.raise_for_status()
 
             token_info = response.json()
@@ -596,7 +1210,7 @@ class Tools:
             creds = Credentials(
                 token=token_info["access_token"],
                 refresh_token=token_info.get("refresh_token"),
-                token_uri="https://oauth2.googleapis.com/token",
+                token_uri=_OAUTH_TOKEN_URL,
                 client_id=credentials["client_id"],
                 client_secret=credentials["client_secret"],
                 scopes=self.valves.SCOPES,
@@ -612,7 +1226,7 @@ class Tools:
             )
 
         except Exception as e:
-            print(f"🚨 OAuth setup error: {str(e)}")
+            logger.error("OAuth setup error: %s", e)
             return f"❌ Error completing OAuth setup: {str(e)}"
 
     def authenticate_google_workspace(self) -> str:
@@ -655,7 +1269,7 @@ class Tools:
         try:
             if os.path.exists(self.pending_oauth_file):
                 with open(self.pending_oauth_file, "r") as f:
-                    oauth_data = json.load(f)
+                    oauth_data = _json_loads(f.read())
 
                 code = oauth_data.get("code")
                 if code:
@@ -667,37 +1281,71 @@ class Tools:
         return ""
 
     # Google Drive Operations
-    def list_google_drive_files(
+    def _list_drive_files_raw(
         self, max_results: int = 10, folder_id: Optional[str] = None
-    ) -> str:
-        """List files in Google Drive."""
-        try:
-            creds = self._get_google_credentials()
-            if not creds:
-                return "❌ Not authenticated. Please run authenticate_google_workspace() first."
+    ) -> Optional[list]:
+        """Return Drive file dicts, newest first, or None when not authenticated."""
+        creds = self._get_google_credentials()
+        if not creds:
+            return None
 
-            service = build("drive", "v3", credentials=creds)
+        service = self._service(creds, "drive", "v3")
 
-            query = "trashed=false"
-            if folder_id:
-                query += f" and '{folder_id}' in parents"
+        query = "trashed=false"
+        if folder_id:
+            query += f" and '{folder_id}' in parents"
 
-            results = (
-                service.files()
-                .list(
-                    pageSize=max_results,
-                    q=query,
-                    orderBy="modifiedTime desc",
-                    fields="nextPageToken, files(id, name, mimeType, modifiedTime, webViewLink)",
-                )
-                .execute()
+        results = (
+            service.files()
+            .list(
+                pageSize=max_results,
+                q=query,
+                orderBy="modifiedTime desc",
+                fields=_DRIVE_FILE_FIELDS,
             )
+            .execute(num_retries=_API_NUM_RETRIES)
+        )
+        return results.get("files", [])
 
-            items = results.get("files", [])
+    def _search_drive_raw(self, query: str, max_results: int = 10) -> Optional[list]:
+        """Return Drive files matching query, or None when not authenticated."""
+        creds = self._get_google_credentials()
+        if not creds:
+            return None
+
+        service = self._service(creds, "drive", "v3")
+
+        # Build search query
+        if _MIME_RE.search(query):
+            search_query = query  # Use raw query if it contains mimeType
+        else:
+            term = _drive_quote(query)
+            search_query = f"name contains '{term}' or fullText contains '{term}'"
+
+        results = (
+            service.files()
+            .list(
+                q=search_query,
+                pageSize=max_results,
+                orderBy="modifiedTime desc",
+                fields=_DRIVE_FILE_FIELDS,
+            )
+            .execute(num_retries=_API_NUM_RETRIES)
+        )
+        return results.get("files", [])
+
+    def list_google_drive_files(
+        self, max_results: int = 10, folder_id: Optional[str] = None
+    ) -> str:
+        """List files in Google Drive."""
+        try:
+            items = self._list_drive_files_raw(max_results, folder_id)
+            if items is None:
+                return "❌ Not authenticated. Please run authenticate_google_workspace() first."
             if not items:
                 return "No files found in Google Drive."
 
-            return json.dumps(items, indent=2)
+            return _json_dumps(items, compact=True)
 
         except Exception as e:
             return f"❌ Error listing Drive files: {str(e)}"
@@ -705,33 +1353,13 @@ class Tools:
     def search_google_drive(self, query: str, max_results: int = 10) -> str:
         """Search for files in Google Drive."""
         try:
-            creds = self._get_google_credentials()
-            if not creds:
+            items = self._search_drive_raw(query, max_results)
+            if items is None:
                 return "❌ Not authenticated. Please run authenticate_google_workspace() first."
-
-            service = build("drive", "v3", credentials=creds)
-
-            # Build search query
-            search_query = f"name contains '{query}' or fullText contains '{query}'"
-            if "mimeType" in query.lower():
-                search_query = query  # Use raw query if it contains mimeType
-
-            results = (
-                service.files()
-                .list(
-                    q=search_query,
-                    pageSize=max_results,
-                    orderBy="modifiedTime desc",
-                    fields="nextPageToken, files(id, name, mimeType, modifiedTime, webViewLink)",
-                )
-                .execute()
-            )
-
-            items = results.get("files", [])
             if not items:
                 return f"No files found matching '{query}'."
 
-            return json.dumps(items, indent=2)
+            return _json_dumps(items, compact=True)
 
         except Exception as e:
             return f"❌ Error searching Google Drive: {str(e)}"
@@ -743,32 +1371,35 @@ class Tools:
             if not creds:
                 return "❌ Not authenticated. Please run authenticate_google_workspace() first."
 
-            docs_service = build("docs", "v1", credentials=creds)
-
-            # Create document
-            doc = docs_service.documents().create(body={"title": title}).execute()
-            doc_id = doc["documentId"]
+            drive_service = self._service(creds, "drive", "v3")
 
-            # Add content if provided
+            # Create the Doc and upload any initial text, converted, in one request
+            media = None
             if content:
-                requests = [{"insertText": {"location": {"index": 1}, "text": content}}]
-                docs_service.documents().batchUpdate(
-                    documentId=doc_id, body={"requests": requests}
-                ).execute()
-
-            # Get shareable link
-            drive_service = build("drive", "v3", credentials=creds)
-            file = (
-                drive_service.files().get(fileId=doc_id, fields="webViewLink").execute()
+                media = MediaInMemoryUpload(
+                    content.encode("utf-8"), mimetype="text/plain"
+                )
+            doc = (
+                drive_service.files()
+                .create(
+                    body={
+                        "name": title,
+                        "mimeType": "application/vnd.google-apps.document",
+                    },
+                    media_body=media,
+                    fields="id",
+                )
+                .execute()
             )
+            doc_id = doc["id"]
 
-            return json.dumps(
+            # A Doc's shareable link follows from its id, so Drive is not asked
+            return _json_dumps(
                 {
                     "documentId": doc_id,
                     "title": title,
-                    "webViewLink": file["webViewLink"],
-                },
-                indent=2,
+                    "webViewLink": _DOC_EDIT_URL_TPL.format(doc_id),
+                }
             )
 
         except Exception as e:
@@ -783,38 +1414,39 @@ class Tools:
             if not creds:
                 return "❌ Not authenticated. Please run authenticate_google_workspace() first."
 
-            sheets_service = build("sheets", "v4", credentials=creds)
+            sheets_service = self._service(creds, "sheets", "v4")
 
-            # Create spreadsheet
+            # Create spreadsheet, seeding any initial rows in the same request
             spreadsheet = {"properties": {"title": title}}
-            result = sheets_service.spreadsheets().create(body=spreadsheet).execute()
-            spreadsheet_id = result["spreadsheetId"]
-
-            # Add data if provided
             if data:
-                body = {"values": data}
-                sheets_service.spreadsheets().values().update(
-                    spreadsheetId=spreadsheet_id,
-                    range="A1",
-                    valueInputOption="RAW",
-                    body=body,
-                ).execute()
-
-            # Get shareable link
-            drive_service = build("drive", "v3", credentials=creds)
-            file = (
-                drive_service.files()
-                .get(fileId=spreadsheet_id, fields="webViewLink")
+                spreadsheet["sheets"] = [
+                    {
+                        "data": [
+                            {
+                                "startRow": 0,
+                                "startColumn": 0,
+                                "rowData": [
+                                    {"values": [_cell_data(cell) for cell in row]}
+                                    for row in data
+                                ],
+                            }
+                        ]
+                    }
+                ]
+            result = (
+                sheets_service.spreadsheets()
+                .create(body=spreadsheet, fields="spreadsheetId,spreadsheetUrl")
                 .execute()
             )
+            spreadsheet_id = result["spreadsheetId"]
 
-            return json.dumps(
+            # The create response already carries the shareable link
+            return _json_dumps(
                 {
                     "spreadsheetId": spreadsheet_id,
                     "title": title,
-                    "webViewLink": file["webViewLink"],
-                },
-                indent=2,
+                    "webViewLink": result["spreadsheetUrl"],
+                }
             )
 
         except Exception as e:
@@ -827,8 +1459,18 @@ class Tools:
             if not creds:
                 return "❌ Not authenticated. Please run authenticate_google_workspace() first."
 
-            docs_service = build("docs", "v1", credentials=creds)
-            doc = docs_service.documents().get(documentId=document_id).execute()
+            cache_key = ("doc", document_id)
+            cached = self._cached_read(cache_key)
+            if cached is not None:
+                return cached
+
+            docs_service = self._service(creds, "docs", "v1")
+            # Only the paragraph text runs are read below, so skip styles, lists etc.
+            doc = (
+                docs_service.documents()
+                .get(documentId=document_id, fields=_DOC_TEXT_FIELDS)
+                .execute(num_retries=_API_NUM_RETRIES)
+            )
 
             content = []
             for element in doc.get("body", {}).get("content", []):
@@ -837,11 +1479,44 @@ class Tools:
                         if "textRun" in text_element:
                             content.append(text_element["textRun"].get("content", ""))
 
-            return "".join(content)
+            return self._cache_read(cache_key, "".join(content))
 
         except Exception as e:
             return f"❌ Error getting document content: {str(e)}"
 
+    def apply_google_doc_edits(self, document_id: str, edits: List[dict]) -> str:
+        """
+        Apply several edits to a Google Document in a single batchUpdate call.
+        Each edit is a Docs API request such as {"replaceAllText": {...}} or
+        {"updateTextStyle": {...}}; edits are applied in order, atomically.
+        Prefer one call with all edits over several separate edit calls.
+        """
+        try:
+            creds = self._get_google_credentials()
+            if not creds:
+                return "❌ Not authenticated. Please run authenticate_google_workspace() first."
+
+            if not edits:
+                return "❌ No edits provided."
+
+            docs_service = self._service(creds, "docs", "v1")
+            result = (
+                docs_service.documents()
+                .batchUpdate(documentId=document_id, body={"requests": edits})
+                .execute()
+            )
+            self._invalidate_reads("doc", document_id)
+
+            return _json_dumps(
+                {
+                    "documentId": document_id,
+                    "appliedEdits": len(result.get("replies", [])),
+                }
+            )
+
+        except Exception as e:
+            return f"❌ Error editing Google Doc: {str(e)}"
+
     # Alias functions for compatibility with original google_workspace_tools.py
     def create_new_document(self, title: str, content: str = "") -> str:
         """Alias for create_google_doc - for compatibility."""
@@ -873,13 +1548,13 @@ class Tools:
                     "❌ Please authenticate first using authenticate_google_workspace()"
                 )
 
-            service = build("gmail", "v1", credentials=creds)
+            service = self._service(creds, "gmail", "v1")
 
             results = (
                 service.users()
                 .messages()
-                .list(userId="me", maxResults=max_results)
-                .execute()
+                .list(userId="me", maxResults=max_results, fields=_GMAIL_LIST_FIELDS)
+                .execute(num_retries=_API_NUM_RETRIES)
             )
 
             messages = results.get("messages", [])
@@ -887,23 +1562,16 @@ class Tools:
                 return "📬 No messages found in your Gmail."
 
             message_list = []
-            for msg in messages[:max_results]:
-                msg_detail = (
-                    service.users()
-                    .messages()
-                    .get(userId="me", id=msg["id"], format="metadata")
-                    .execute()
-                )
-
+            message_ids = [msg["id"] for msg in messages[:max_results]]
+            for msg_detail in self._batch_get_messages(
+                service,
+                message_ids,
+                format="metadata",
+                metadataHeaders=_GMAIL_METADATA_HEADERS,
+                fields=_GMAIL_HEADER_FIELDS,
+            ):
                 headers = msg_detail["payload"].get("headers", [])
-                subject = next(
-                    (h["value"] for h in headers if h["name"] == "Subject"),
-                    "No Subject",
-                )
-                sender = next(
-                    (h["value"] for h in headers if h["name"] == "From"),
-                    "Unknown Sender",
-                )
+                subject, sender, _ = _message_headers(headers)
 
                 message_list.append(f"📧 **{subject}**\n   From: {sender}")
 
@@ -912,6 +1580,55 @@ class Tools:
         except Exception as e:
             return f"❌ Error accessing Gmail: {str(e)}"
 
+    def _batch_get_messages(self, service, message_ids, **get_kwargs) -> list:
+        """
+        Fetch several Gmail messages with a single batch request.
+        Returns the message resources in the same order as message_ids.
+        Calls throttled or failed by Google are fetched again one by one.
+        """
+        responses = {}
+        errors = []
+        retry_ids = []
+
+        def _collect(request_id, response, exception):
+            if exception is None:
+                responses[request_id] = response
+            elif isinstance(exception, HttpError) and (
+                exception.resp.status == 429 or exception.resp.status >= 500
+            ):
+                retry_ids.append(request_id)
+            else:
+                errors.append(exception)
+
+        limit = (
+            _GMAIL_FULL_BATCH_LIMIT
+            if get_kwargs.get("format") == "full"
+            else _GMAIL_BATCH_LIMIT
+        )
+        for start in range(0, len(message_ids), limit):
+            batch = service.new_batch_http_request(callback=_collect)
+            for message_id in message_ids[start : start + limit]:
+                batch.add(
+                    service.users()
+                    .messages()
+                    .get(userId="me", id=message_id, **get_kwargs),
+                    request_id=message_id,
+                )
+            batch.execute()
+
+        if errors:
+            raise errors[0]
+
+        for message_id in retry_ids:
+            responses[message_id] = (
+                service.users()
+                .messages()
+                .get(userId="me", id=message_id, **get_kwargs)
+                .execute(num_retries=_API_NUM_RETRIES)
+            )
+
+        return [responses[message_id] for message_id in message_ids]
+
     def send_gmail(self, to_email: str, subject: str, body: str) -> str:
         """Send a Gmail message."""
         try:
@@ -921,14 +1638,12 @@ class Tools:
                     "❌ Please authenticate first using authenticate_google_workspace()"
                 )
 
-            service = build("gmail", "v1", credentials=creds)
+            service = self._service(creds, "gmail", "v1")
 
-            import base64
-            from email.mime.text import MIMEText
-
-            msg = MIMEText(body)
-            msg["to"] = to_email
-            msg["subject"] = subject
+            msg = EmailMessage()
+            msg["To"] = to_email
+            msg["Subject"] = subject
+            msg.set_content(body)
 
             raw_message = base64.urlsafe_b64encode(msg.as_bytes()).decode()
 
@@ -955,13 +1670,18 @@ class Tools:
                     "❌ Please authenticate first using authenticate_google_workspace()"
                 )
 
-            service = build("gmail", "v1", credentials=creds)
+            service = self._service(creds, "gmail", "v1")
 
             results = (
                 service.users()
                 .messages()
-                .list(userId="me", q=query, maxResults=max_results)
-                .execute()
+                .list(
+                    userId="me",
+                    q=query,
+                    maxResults=max_results,
+                    fields=_GMAIL_LIST_FIELDS,
+                )
+                .execute(num_retries=_API_NUM_RETRIES)
             )
 
             messages = results.get("messages", [])
@@ -969,23 +1689,16 @@ class Tools:
                 return f"🔍 No Gmail messages found for query: '{query}'"
 
             message_list = []
-            for msg in messages[:max_results]:
-                msg_detail = (
-                    service.users()
-                    .messages()
-                    .get(userId="me", id=msg["id"], format="metadata")
-                    .execute()
-                )
-
+            message_ids = [msg["id"] for msg in messages[:max_results]]
+            for msg_detail in self._batch_get_messages(
+                service,
+                message_ids,
+                format="metadata",
+                metadataHeaders=_GMAIL_METADATA_HEADERS,
+                fields=_GMAIL_HEADER_FIELDS,
+            ):
                 headers = msg_detail["payload"].get("headers", [])
-                subject = next(
-                    (h["value"] for h in headers if h["name"] == "Subject"),
-                    "No Subject",
-                )
-                sender = next(
-                    (h["value"] for h in headers if h["name"] == "From"),
-                    "Unknown Sender",
-                )
+                subject, sender, _ = _message_headers(headers)
 
                 message_list.append(f"📧 **{subject}**\n   From: {sender}")
 
@@ -1003,18 +1716,16 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("gmail", "v1", credentials=creds)
+            service = self._service(creds, "gmail", "v1")
             
             # Get the full message
             message = service.users().messages().get(
                 userId="me", id=message_id, format="full"
-            ).execute()
+            ).execute(num_retries=_API_NUM_RETRIES)
             
             # Extract metadata
             headers = message["payload"].get("headers", [])
-            subject = next((h["value"] for h in headers if h["name"] == "Subject"), "No Subject")
-            sender = next((h["value"] for h in headers if h["name"] == "From"), "Unknown Sender")
-            date = next((h["value"] for h in headers if h["name"] == "Date"), "Unknown Date")
+            subject, sender, date = _message_headers(headers)
             
             # Extract body content
             body = self._extract_message_body(message["payload"])
@@ -1037,50 +1748,41 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("gmail", "v1", credentials=creds)
+            service = self._service(creds, "gmail", "v1")
             
             # Search for messages from the sender
             results = service.users().messages().list(
                 userId="me", 
                 q=f"from:{sender_email}",
-                maxResults=max_results
-            ).execute()
+                maxResults=max_results,
+                fields=_GMAIL_LIST_FIELDS,
+            ).execute(num_retries=_API_NUM_RETRIES)
             
             messages = results.get("messages", [])
             if not messages:
                 return f"📭 No messages found from {sender_email}"
 
-            message_details = []
-            for msg in messages:
-                # Get full message content
-                full_msg = service.users().messages().get(
-                    userId="me", id=msg["id"], format="full"
-                ).execute()
-                
+            parts = [f"📧 **Messages from {sender_email}:**\n\n"]
+            # Fetch every full message in one batch request
+            full_msgs = self._batch_get_messages(
+                service, [msg["id"] for msg in messages], format="full"
+            )
+            for i, (msg, full_msg) in enumerate(zip(messages, full_msgs), 1):
                 headers = full_msg["payload"].get("headers", [])
-                subject = next((h["value"] for h in headers if h["name"] == "Subject"), "No Subject")
-                date = next((h["value"] for h in headers if h["name"] == "Date"), "Unknown Date")
+                subject, _, date = _message_headers(headers)
                 
                 # Extract body
                 body = self._extract_message_body(full_msg["payload"])
                 
-                message_details.append({
-                    "subject": subject,
-                    "date": date,
-                    "body": body,
-                    "id": msg["id"]
-                })
-
-            # Format the response
-            result = f"📧 **Messages from {sender_email}:**\n\n"
-            for i, msg in enumerate(message_details, 1):
-                result += f"**{i}. {msg['subject']}**\n"
-                result += f"   Date: {msg['date']}\n"
-                result += f"   ID: {msg['id']}\n\n"
-                result += f"   Content:\n{msg['body']}\n\n"
-                result += "---\n\n"
-            
-            return result
+                parts.append(
+                    f"**{i}. {subject}**\n"
+                    f"   Date: {date}\n"
+                    f"   ID: {msg['id']}\n\n"
+                    f"   Content:\n{body}\n\n"
+                    "---\n\n"
+                )
+
+            return "".join(parts)
 
         except Exception as e:
             return f"❌ Error reading messages from {sender_email}: {str(e)}"
@@ -1092,51 +1794,39 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("gmail", "v1", credentials=creds)
+            service = self._service(creds, "gmail", "v1")
             
             # Get recent messages
             results = service.users().messages().list(
-                userId="me", maxResults=max_results
-            ).execute()
+                userId="me", maxResults=max_results, fields=_GMAIL_LIST_FIELDS
+            ).execute(num_retries=_API_NUM_RETRIES)
             
             messages = results.get("messages", [])
             if not messages:
                 return "📬 No messages found in your Gmail."
 
-            message_details = []
-            for msg in messages:
-                # Get full message content
-                full_msg = service.users().messages().get(
-                    userId="me", id=msg["id"], format="full"
-                ).execute()
-                
+            parts = [f"📧 **Latest {len(messages)} emails with content:**\n\n"]
+            # Fetch every full message in one batch request
+            full_msgs = self._batch_get_messages(
+                service, [msg["id"] for msg in messages], format="full"
+            )
+            for i, (msg, full_msg) in enumerate(zip(messages, full_msgs), 1):
                 headers = full_msg["payload"].get("headers", [])
-                subject = next((h["value"] for h in headers if h["name"] == "Subject"), "No Subject")
-                sender = next((h["value"] for h in headers if h["name"] == "From"), "Unknown Sender")
-                date = next((h["value"] for h in headers if h["name"] == "Date"), "Unknown Date")
+                subject, sender, date = _message_headers(headers)
                 
                 # Extract body
                 body = self._extract_message_body(full_msg["payload"])
                 
-                message_details.append({
-                    "subject": subject,
-                    "sender": sender,
-                    "date": date,
-                    "body": body,
-                    "id": msg["id"]
-                })
-
-            # Format the response
-            result = f"📧 **Latest {len(message_details)} emails with content:**\n\n"
-            for i, msg in enumerate(message_details, 1):
-                result += f"**{i}. {msg['subject']}**\n"
-                result += f"   From: {msg['sender']}\n"
-                result += f"   Date: {msg['date']}\n"
-                result += f"   ID: {msg['id']}\n\n"
-                result += f"   Content:\n{msg['body']}\n\n"
-                result += "---\n\n"
-            
-            return result
+                parts.append(
+                    f"**{i}. {subject}**\n"
+                    f"   From: {sender}\n"
+                    f"   Date: {date}\n"
+                    f"   ID: {msg['id']}\n\n"
+                    f"   Content:\n{body}\n\n"
+                    "---\n\n"
+                )
+
+            return "".join(parts)
 
         except Exception as e:
             return f"❌ Error getting latest emails: {str(e)}"
@@ -1150,29 +1840,21 @@ class Tools:
             for part in payload["parts"]:
                 if part["mimeType"] == "text/plain":
                     if "data" in part["body"]:
-                        import base64
-                        body = base64.urlsafe_b64decode(part["body"]["data"]).decode("utf-8")
+                        body = _body_text(part["body"]["data"])
                         break
                 elif part["mimeType"] == "text/html" and not body:
                     if "data" in part["body"]:
-                        import base64
-                        html_body = base64.urlsafe_b64decode(part["body"]["data"]).decode("utf-8")
                         # Simple HTML to text conversion
-                        import re
-                        body = re.sub(r'<[^>]+>', '', html_body)
+                        body = _body_text(part["body"]["data"], html=True)
         else:
             # Single part message
             if payload["mimeType"] == "text/plain":
                 if "data" in payload["body"]:
-                    import base64
-                    body = base64.urlsafe_b64decode(payload["body"]["data"]).decode("utf-8")
+                    body = _body_text(payload["body"]["data"])
             elif payload["mimeType"] == "text/html":
                 if "data" in payload["body"]:
-                    import base64
-                    html_body = base64.urlsafe_b64decode(payload["body"]["data"]).decode("utf-8")
                     # Simple HTML to text conversion
-                    import re
-                    body = re.sub(r'<[^>]+>', '', html_body)
+                    body = _body_text(payload["body"]["data"], html=True)
         
         return body.strip() if body else "No readable content found"
 
@@ -1187,10 +1869,9 @@ class Tools:
             if not creds:
                 return "🔐 **Authentication Required**\n\nPlease call authenticate_google_workspace() first to set up Google access, then I can read your emails."
 
-            service = build("gmail", "v1", credentials=creds)
+            service = self._service(creds, "gmail", "v1")
             
             # Get today's date for search
-            import datetime
             today = datetime.date.today()
             today_str = today.strftime("%Y/%m/%d")
             
@@ -1198,49 +1879,38 @@ class Tools:
             results = service.users().messages().list(
                 userId="me", 
                 q=f"after:{today_str}",
-                maxResults=10
-            ).execute()
+                maxResults=10,
+                fields=_GMAIL_LIST_FIELDS,
+            ).execute(num_retries=_API_NUM_RETRIES)
             
             messages = results.get("messages", [])
             
             if not messages:
                 return f"📭 **No new emails today** ({today.strftime('%B %d, %Y')})\n\nYour inbox is clear for today!"
 
-            message_details = []
-            for msg in messages:
-                # Get full message content
-                full_msg = service.users().messages().get(
-                    userId="me", id=msg["id"], format="full"
-                ).execute()
-                
+            parts = [
+                f"📬 **{len(messages)} emails from today ({today.strftime('%B %d, %Y')}) with content:**\n\n"
+            ]
+            # Fetch every full message in one batch request
+            full_msgs = self._batch_get_messages(
+                service, [msg["id"] for msg in messages], format="full"
+            )
+            for i, (msg, full_msg) in enumerate(zip(messages, full_msgs), 1):
                 headers = full_msg["payload"].get("headers", [])
-                subject = next((h["value"] for h in headers if h["name"] == "Subject"), "No Subject")
-                sender = next((h["value"] for h in headers if h["name"] == "From"), "Unknown Sender")
-                date = next((h["value"] for h in headers if h["name"] == "Date"), "Unknown Date")
+                subject, sender, date = _message_headers(headers)
                 
                 # Extract body
                 body = self._extract_message_body(full_msg["payload"])
                 
-                message_details.append({
-                    "subject": subject,
-                    "sender": sender,
-                    "date": date,
-                    "body": body,
-                    "id": msg["id"]
-                })
-
-            # Format the response
-            total_count = len(message_details)
-            result = f"📬 **{total_count} emails from today ({today.strftime('%B %d, %Y')}) with content:**\n\n"
-            
-            for i, msg in enumerate(message_details, 1):
-                result += f"**{i}. {msg['subject']}**\n"
-                result += f"   From: {msg['sender']}\n"
-                result += f"   Date: {msg['date']}\n\n"
-                result += f"   **Content:**\n{msg['body'][:500]}{'...' if len(msg['body']) > 500 else ''}\n\n"
-                result += "---\n\n"
-            
-            return result
+                parts.append(
+                    f"**{i}. {subject}**\n"
+                    f"   From: {sender}\n"
+                    f"   Date: {date}\n\n"
+                    f"   **Content:**\n{body[:500]}{'...' if len(body) > 500 else ''}\n\n"
+                    "---\n\n"
+                )
+
+            return "".join(parts)
 
         except Exception as e:
             return f"❌ Error reading today's emails: {str(e)}"
@@ -1254,35 +1924,54 @@ class Tools:
                     "❌ Please authenticate first using authenticate_google_workspace()"
                 )
 
-            service = build("calendar", "v3", credentials=creds)
-
-            import datetime
+            service = self._service(creds, "calendar", "v3")
 
-            now = datetime.datetime.utcnow().isoformat() + "Z"
-
-            events_result = (
-                service.events()
-                .list(
-                    calendarId="primary",
-                    timeMin=now,
-                    maxResults=max_results,
-                    singleEvents=True,
-                    orderBy="startTime",
-                )
-                .execute()
+            # Bucket timeMin to the minute so repeat polls can be revalidated
+            time_min = (
+                datetime.datetime.now(datetime.timezone.utc)
+                .replace(second=0, microsecond=0)
+                .isoformat()
+            )
+            cache_key = (max_results, time_min)
+            cached = self._calendar_cache
+            if cached and cached[0] != cache_key:
+                cached = None
+
+            request = service.events().list(
+                calendarId="primary",
+                timeMin=time_min,
+                maxResults=max_results,
+                singleEvents=True,
+                orderBy="startTime",
+                fields="etag,items(summary,start)",
             )
+            if cached:
+                request.headers["If-None-Match"] = cached[1]
+
+            try:
+                events_result = request.execute(num_retries=_API_NUM_RETRIES)
+            except HttpError as e:
+                if cached and e.resp.status == 304:
+                    return cached[2]
+                raise
 
             events = events_result.get("items", [])
             if not events:
-                return "📅 No upcoming events found in your calendar."
-
-            event_list = []
-            for event in events:
-                start = event["start"].get("dateTime", event["start"].get("date"))
-                summary = event.get("summary", "No Title")
-                event_list.append(f"📅 **{summary}**\n   📍 {start}")
+                response = "📅 No upcoming events found in your calendar."
+            else:
+                event_list = []
+                for event in events:
+                    start = event["start"].get("dateTime", event["start"].get("date"))
+                    summary = event.get("summary", "No Title")
+                    event_list.append(f"📅 **{summary}**\n   📍 {start}")
+
+                response = "📅 **Upcoming Calendar Events:**\n\n" + "\n\n".join(
+                    event_list
+                )
 
-            return "📅 **Upcoming Calendar Events:**\n\n" + "\n\n".join(event_list)
+            etag = events_result.get("etag")
+            self._calendar_cache = (cache_key, etag, response) if etag else None
+            return response
 
         except Exception as e:
             return f"❌ Error accessing Calendar: {str(e)}"
@@ -1298,7 +1987,7 @@ class Tools:
                     "❌ Please authenticate first using authenticate_google_workspace()"
                 )
 
-            service = build("calendar", "v3", credentials=creds)
+            service = self._service(creds, "calendar", "v3")
 
             event = {
                 "summary": title,
@@ -1328,13 +2017,19 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("people", "v1", credentials=creds)
+            cache_key = ("contacts", "list", max_results)
+            cached = self._cached_read(cache_key)
+            if cached is not None:
+                return cached
+
+            service = self._service(creds, "people", "v1")
             
             results = service.people().connections().list(
                 resourceName='people/me',
-                personFields='names,emailAddresses,phoneNumbers,organizations',
-                pageSize=max_results
-            ).execute()
+                personFields='names,emailAddresses,phoneNumbers',
+                pageSize=max_results,
+                fields='connections(names,emailAddresses,phoneNumbers)',
+            ).execute(num_retries=_API_NUM_RETRIES)
             
             connections = results.get('connections', [])
             if not connections:
@@ -1352,7 +2047,11 @@ class Tools:
                 
                 contact_list.append(f"👤 **{name}**\n   📧 {email}\n   📞 {phone}")
 
-            return f"📇 **Your Google Contacts ({len(contact_list)} contacts):**\n\n" + "\n\n".join(contact_list)
+            return self._cache_read(
+                cache_key,
+                f"📇 **Your Google Contacts ({len(contact_list)} contacts):**\n\n"
+                + "\n\n".join(contact_list),
+            )
 
         except Exception as e:
             return f"❌ Error accessing contacts: {str(e)}"
@@ -1364,12 +2063,17 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("people", "v1", credentials=creds)
+            cache_key = ("contacts", "search", query)
+            cached = self._cached_read(cache_key)
+            if cached is not None:
+                return cached
+
+            service = self._service(creds, "people", "v1")
             
             results = service.people().searchContacts(
                 query=query,
                 readMask='names,emailAddresses,phoneNumbers'
-            ).execute()
+            ).execute(num_retries=_API_NUM_RETRIES)
             
             contacts = results.get('results', [])
             if not contacts:
@@ -1388,7 +2092,11 @@ class Tools:
                 
                 contact_list.append(f"👤 **{name}**\n   📧 {email}\n   📞 {phone}")
 
-            return f"🔍 **Contacts matching '{query}' ({len(contact_list)} found):**\n\n" + "\n\n".join(contact_list)
+            return self._cache_read(
+                cache_key,
+                f"🔍 **Contacts matching '{query}' ({len(contact_list)} found):**\n\n"
+                + "\n\n".join(contact_list),
+            )
 
         except Exception as e:
             return f"❌ Error searching contacts: {str(e)}"
@@ -1401,9 +2109,18 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("tasks", "v1", credentials=creds)
+            cache_key = ("tasks", tasklist)
+            cached = self._cached_read(cache_key)
+            if cached is not None:
+                return cached
+
+            service = self._service(creds, "tasks", "v1")
             
-            results = service.tasks().list(tasklist=tasklist).execute()
+            results = (
+                service.tasks()
+                .list(tasklist=tasklist)
+                .execute(num_retries=_API_NUM_RETRIES)
+            )
             items = results.get('items', [])
             
             if not items:
@@ -1425,7 +2142,11 @@ class Tools:
                 
                 task_list.append(task_info)
 
-            return f"📋 **Your Google Tasks ({len(task_list)} tasks):**\n\n" + "\n\n".join(task_list)
+            return self._cache_read(
+                cache_key,
+                f"📋 **Your Google Tasks ({len(task_list)} tasks):**\n\n"
+                + "\n\n".join(task_list),
+            )
 
         except Exception as e:
             return f"❌ Error accessing tasks: {str(e)}"
@@ -1437,7 +2158,7 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("tasks", "v1", credentials=creds)
+            service = self._service(creds, "tasks", "v1")
             
             task = {
                 'title': title,
@@ -1448,6 +2169,7 @@ class Tools:
                 task['due'] = due_date
 
             result = service.tasks().insert(tasklist='@default', body=task).execute()
+            self._invalidate_reads("tasks")
             
             return f"✅ Task created successfully!\n📋 **{title}**\nTask ID: {result['id']}"
 
@@ -1476,7 +2198,7 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("forms", "v1", credentials=creds)
+            service = self._service(creds, "forms", "v1")
             
             form = {
                 "info": {
@@ -1488,7 +2210,7 @@ class Tools:
             result = service.forms().create(body=form).execute()
             
             form_id = result['formId']
-            form_url = f"https://docs.google.com/forms/d/{form_id}/edit"
+            form_url = _FORM_EDIT_URL_TPL.format(form_id)
             
             return f"✅ Google Form created successfully!\n📋 **{title}**\nForm ID: {form_id}\nEdit URL: {form_url}"
 
@@ -1503,9 +2225,13 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("sites", "v1", credentials=creds)
+            cached = self._cached_read(("sites",))
+            if cached is not None:
+                return cached
+
+            service = self._service(creds, "sites", "v1")
             
-            results = service.sites().list().execute()
+            results = service.sites().list().execute(num_retries=_API_NUM_RETRIES)
             sites = results.get('sites', [])
             
             if not sites:
@@ -1519,7 +2245,11 @@ class Tools:
                 
                 site_list.append(f"🌐 **{title}**\n   Name: {name}\n   URL: {site_url}")
 
-            return f"🌐 **Your Google Sites ({len(site_list)} sites):**\n\n" + "\n\n".join(site_list)
+            return self._cache_read(
+                ("sites",),
+                f"🌐 **Your Google Sites ({len(site_list)} sites):**\n\n"
+                + "\n\n".join(site_list),
+            )
 
         except Exception as e:
             return f"❌ Error accessing sites: {str(e)}"
@@ -1532,9 +2262,9 @@ class Tools:
             if not creds:
                 return "❌ Please authenticate first using authenticate_google_workspace()"
 
-            service = build("oauth2", "v2", credentials=creds)
+            service = self._service(creds, "oauth2", "v2")
             
-            user_info = service.userinfo().get().execute()
+            user_info = service.userinfo().get().execute(num_retries=_API_NUM_RETRIES)
             
             name = user_info.get('name', 'No Name')
             email = user_info.get('email', 'No Email')
@@ -1555,157 +2285,84 @@ class Tools:
     # Natural Language Interface
     def handle_user_message(self, message: str) -> str:
         """Process natural language requests for Google Workspace operations."""
-        message_lower = message.lower().strip()
+        # Common canned prompts skip the regex routing entirely
+        if len(message) <= _FAST_PATH_MAX_LEN:
+            fast_path = _FAST_PATHS.get(message.strip().lower())
+            if fast_path:
+                return getattr(self, fast_path)()
 
         # OAuth completion
         oauth_result = self._process_oauth_message(message)
         if oauth_result:
             return oauth_result
 
+        # Collect every routing keyword in one case-insensitive scan of the message
+        keywords = {word.lower() for word in _ROUTE_KEYWORDS_RE.findall(message)}
+
         # Drive operations
-        if any(word in message_lower for word in ["drive", "files", "documents"]):
-            if "proposal" in message_lower:
+        if keywords & {"drive", "files", "documents"}:
+            if "proposal" in keywords:
                 return self._handle_proposal_search(message)
-            elif "show" in message_lower or "list" in message_lower:
+            elif "show" in keywords or "list" in keywords:
                 return self.show_my_drive_files()
-            elif "search" in message_lower:
-                query = re.sub(r".*search.*for\s+", "", message_lower)
+            elif "search" in keywords:
+                # Keep what follows the last "for " once "search" has appeared
+                message_lower = message.lower().strip()
+                head, sep, query = message_lower.rpartition("for ")
+                query = query.lstrip() if sep and "search" in head else message_lower
                 return self.search_my_drive(query)
 
         # Handle natural language search
-        if any(word in message_lower for word in ["find", "show", "search"]):
+        if keywords & {"find", "show", "search"}:
             return self._handle_natural_language_search(message)
 
         return ""
 
     def _process_oauth_message(self, message: str) -> str:
         """Process OAuth completion messages."""
-        patterns = [
-            r"Complete authentication with code:\s*([0-9A-Za-z\-_/]+)",
-            r"Authorization code:\s*([0-9A-Za-z\-_/]+)",
-            r"Code:\s*([0-9A-Za-z\-_/]+)",
-            r"4/[0-9A-Za-z\-_]+",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, message)
-            if match:
-                auth_code = match.group(1) if match.lastindex else match.group(0)
-                auth_code = re.sub(r"[^\w\-_/]", "", auth_code)
-
-                if len(auth_code) > 10:
-                    return self.complete_oauth_setup(auth_code)
+        for match in _OAUTH_RE.finditer(message):
+            # Both branches only capture [0-9A-Za-z_/-], so no sanitising is needed
+            auth_code = match.group(1) or match.group(0)
+
+            if len(auth_code) > 10:
+                return self.complete_oauth_setup(auth_code)
 
         return ""
 
     def _handle_proposal_search(self, message: str) -> str:
         """Handle search for proposal documents."""
         try:
-            # Search for Google Docs with "Proposal" in name
-            results = self.search_google_drive("Proposal", max_results=10)
-            files = json.loads(results)
-
-            # Filter for Google Docs
-            docs = [f for f in files if "document" in f.get("mimeType", "")]
-            docs = docs[:3]  # Take top 3
+            # Let Drive filter to the newest 3 Google Docs with "Proposal" in name
+            docs = self._search_drive_raw(
+                "name contains 'Proposal' and "
+                "mimeType='application/vnd.google-apps.document'",
+                max_results=3,
+            )
+            if docs is None:
+                return "❌ Not authenticated. Please run authenticate_google_workspace() first."
 
             if not docs:
                 return "❌ No Google Docs with 'Proposal' found in your Drive."
 
-            response = "📄 **Newest 3 Google Docs with 'Proposal' in the name:**\n\n"
+            parts = ["📄 **Newest 3 Google Docs with 'Proposal' in the name:**\n\n"]
             for i, doc in enumerate(docs, 1):
                 name = doc.get("name", "Unknown")
-                modified = doc.get("modifiedTime", "Unknown")[:10]
+                modified = (doc.get("modifiedTime") or "Unknown")[:10]
                 link = doc.get("webViewLink", "")
 
-                response += f"{i}. **{name}**\n"
-                response += f"   Last modified: {modified}\n"
+                parts.append(f"{i}. **{name}**\n   Last modified: {modified}\n")
                 if link:
-                    response += f"   [Open Document]({link})\n"
-                response += "\n"
+                    parts.append(f"   [Open Document]({link})\n")
+                parts.append("\n")
 
-            return response
+            return "".join(parts)
 
         except Exception as e:
             return f"❌ Error searching for proposals: {str(e)}"
 
     def _handle_natural_language_search(self, message: str) -> str:
         """Handle natural language search requests with flexible query extraction."""
-        message_lower = message.lower().strip()
-
-        # Extract search query and file type from natural language
-        search_patterns = [
-            (r"find.*(?:google docs?|documents?)\s+(?:with\s+)?(.+)", "document"),
-            (
-                r"find.*(?:google sheets?|spreadsheets?)\s+(?:with\s+)?(.+)",
-                "spreadsheet",
-            ),
-            (
-                r"find.*(?:google slides?|presentations?)\s+(?:with\s+)?(.+)",
-                "presentation",
-            ),
-            (r"find.*(?:pdf|pdfs)\s+(?:with\s+)?(.+)", "pdf"),
-            (r"find.*(?:files?|docs?)\s+(?:with\s+)?(.+)", None),
-            (r"search.*(?:for\s+)?(.+)", None),
-            (r"show.*(?:me\s+)?(.+)", None),
-        ]
-
-        query = None
-        file_type = None
-        max_results = 10
-
-        # Try to extract number
-        num_match = re.search(r"(\d+)\s*(?:newest|latest|recent|top)?", message_lower)
-        if num_match:
-            max_results = int(num_match.group(1))
-
-        # Try to extract query and file type
-        for pattern, mime_filter in search_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                query = match.group(1).strip()
-                file_type = mime_filter
-                break
-
-        # Default to simple keyword extraction if no pattern matched
-        if not query:
-            # Remove common words and extract the main search term
-            words = message_lower.split()
-            keywords = [
-                w
-                for w in words
-                if w
-                not in [
-                    "find",
-                    "show",
-                    "me",
-                    "my",
-                    "the",
-                    "search",
-                    "for",
-                    "in",
-                    "drive",
-                    "google",
-                    "docs",
-                    "files",
-                    "documents",
-                ]
-            ]
-            query = " ".join(keywords) if keywords else "*"
-
-        # Build search query
-        search_query = query
-        if file_type:
-            mime_map = {
-                "document": "application/vnd.google-apps.document",
-                "spreadsheet": "application/vnd.google-apps.spreadsheet",
-                "presentation": "application/vnd.google-apps.presentation",
-                "pdf": "application/pdf",
-            }
-            if file_type in mime_map:
-                search_query = f"mimeType='{mime_map[file_type]}' and (name contains '{query}' or fullText contains '{query}')"
-            else:
-                search_query = f"name contains '{query}' or fullText contains '{query}'"
+        search_query, max_results, file_type = _parse_nl_query(message.strip())
 
         return self.search_my_drive(
             query=search_query, max_results=max_results, file_type_hint=file_type
@@ -1720,19 +2377,21 @@ class Tools:
             if not creds:
                 return "❌ Not authenticated. Please run authenticate_google_workspace() first."
 
-            service = build("drive", "v3", credentials=creds)
+            service = self._service(creds, "drive", "v3")
 
             # Use provided query or build from hint
             search_query = query
-            if file_type_hint and "mimeType" not in query.lower():
-                mime_map = {
-                    "document": "application/vnd.google-apps.document",
-                    "spreadsheet": "application/vnd.google-apps.spreadsheet",
-                    "presentation": "application/vnd.google-apps.presentation",
-                    "pdf": "application/pdf",
-                }
-                if file_type_hint in mime_map:
-                    search_query = f"mimeType='{mime_map[file_type_hint]}' and (name contains '{query}' or fullText contains '{query}')"
+            if file_type_hint and not _MIME_RE.search(query):
+                if file_type_hint in _MIME_MAP:
+                    term = _drive_quote(query)
+                    search_query = f"mimeType='{_MIME_MAP[file_type_hint]}' and (name contains '{term}' or fullText contains '{term}')"
+
+            # Repeated searches within a few seconds reuse the formatted reply
+            cache_key = (search_query, max_results)
+            with self._search_cache_lock:
+                cached = self._search_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < _SEARCH_CACHE_TTL:
+                return cached[1]
 
             results = (
                 service.files()
@@ -1740,70 +2399,100 @@ class Tools:
                     q=search_query,
                     pageSize=max_results,
                     orderBy="modifiedTime desc",
-                    fields="nextPageToken, files(id, name, mimeType, modifiedTime, webViewLink)",
+                    fields=_DRIVE_FILE_FIELDS,
                 )
-                .execute()
+                .execute(num_retries=_API_NUM_RETRIES)
             )
 
             items = results.get("files", [])
             if not items:
-                return f"🔍 No files found matching '{query}'."
+                return self._cache_search(
+                    cache_key, f"🔍 No files found matching '{query}'."
+                )
 
             # Format results nicely
-            response = (
+            parts = [
                 f"🔍 **Search Results** ({len(items)} files found for '{query}'):\n\n"
-            )
+            ]
 
             for i, file in enumerate(items, 1):
                 name = file.get("name", "Unknown")
                 mime_type = file.get("mimeType", "Unknown")
 
                 # Convert mime types to friendly names
-                type_map = {
-                    "application/vnd.google-apps.document": "📄 Google Doc",
-                    "application/vnd.google-apps.spreadsheet": "📊 Google Sheet",
-                    "application/vnd.google-apps.presentation": "🎯 Google Slides",
-                    "application/pdf": "📑 PDF",
-                    "application/vnd.google-apps.folder": "📁 Folder",
-                }
-
-                file_type = type_map.get(mime_type, f"📄 {mime_type.split('.')[-1]}")
-                modified = file.get("modifiedTime", "Unknown")[:10]
+                file_type = _FRIENDLY_TYPE_MAP.get(
+                    mime_type, f"📄 {mime_type.split('.')[-1]}"
+                )
+                modified = (file.get("modifiedTime") or "Unknown")[:10]
                 link = file.get("webViewLink", "")
 
-                response += f"{i}. **{name}**\n"
-                response += f"   Type: {file_type}\n"
-                response += f"   Modified: {modified}\n"
+                parts.append(
+                    f"{i}. **{name}**\n   Type: {file_type}\n   Modified: {modified}\n"
+                )
                 if link:
-                    response += f"   [Open File]({link})\n"
-                response += "\n"
+                    parts.append(f"   [Open File]({link})\n")
+                parts.append("\n")
 
-            return response
+            return self._cache_search(cache_key, "".join(parts))
 
         except Exception as e:
             return f"❌ Error searching Google Drive: {str(e)}"
 
+    def _cache_search(self, key: tuple, response: str) -> str:
+        """Remember a search_my_drive reply, evicting the oldest entry when full."""
+        with self._search_cache_lock:
+            if len(self._search_cache) >= _SEARCH_CACHE_SIZE:
+                self._search_cache.pop(next(iter(self._search_cache)))
+            self._search_cache[key] = (time.monotonic(), response)
+        return response
+
+    def _cached_read(self, key: tuple) -> Optional[str]:
+        """Return the cached reply for a read-only tool call while it is fresh."""
+        with self._read_cache_lock:
+            cached = self._read_cache.get(key)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        return None
+
+    def _cache_read(self, key: tuple, response: str) -> str:
+        """Remember a read-only tool reply for its kind's TTL, evicting the oldest."""
+        expires_at = time.monotonic() + _READ_CACHE_TTL[key[0]]
+        with self._read_cache_lock:
+            if len(self._read_cache) >= _READ_CACHE_SIZE:
+                self._read_cache.pop(next(iter(self._read_cache)))
+            self._read_cache[key] = (expires_at, response)
+        return response
+
+    def _invalidate_reads(self, *key_prefix) -> None:
+        """Drop cached read-only replies whose key starts with key_prefix."""
+        size = len(key_prefix)
+        with self._read_cache_lock:
+            for key in [key for key in self._read_cache if key[:size] == key_prefix]:
+                del self._read_cache[key]
+
     # User-friendly wrappers
     def show_my_drive_files(self, max_results: int = 10) -> str:
         """Show user's Google Drive files in a friendly format."""
-        result = self.list_google_drive_files(max_results)
         try:
-            files = json.loads(result)
+            files = self._list_drive_files_raw(max_results)
+            if files is None:
+                return "❌ Not authenticated. Please run authenticate_google_workspace() first."
             if not files:
                 return "📁 Your Google Drive is empty or no files found."
 
-            response = f"📁 **Your Google Drive Files** ({len(files)} files):\n\n"
+            parts = [f"📁 **Your Google Drive Files** ({len(files)} files):\n\n"]
             for i, file in enumerate(files, 1):
                 name = file.get("name", "Unknown")
                 mime_type = file.get("mimeType", "Unknown").split(".")[-1]
-                modified = file.get("modifiedTime", "Unknown")[:10]
+                modified = (file.get("modifiedTime") or "Unknown")[:10]
 
-                response += f"{i}. **{name}** ({mime_type})\n"
-                response += f"   Modified: {modified}\n\n"
+                parts.append(
+                    f"{i}. **{name}** ({mime_type})\n   Modified: {modified}\n\n"
+                )
 
-            return response
-        except Exception:
-            return result
+            return "".join(parts)
+        except Exception as e:
+            return f"❌ Error listing Drive files: {str(e)}"
 
     def quick_start_google_workspace(self) -> str:
         """One-click start for Google Workspace setup."""
@@ -1823,13 +2512,14 @@ class Tools:
             "2. Follow the authorization link\n"
             "3. Complete authentication\n\n"
             "**🎯 Full Google Workspace Access - 40+ Functions Available:**\n\n"
-            "📁 **Drive (7 functions):**\n"
+            "📁 **Drive (8 functions):**\n"
             "• show_my_drive_files() - View your files\n"
             "• search_my_drive('keyword') - Search files\n"
             "• search_google_drive('query') - Advanced search\n"
             "• create_google_doc('Title', 'content') - Create docs\n"
             "• create_google_sheet('Title', data) - Create sheets\n"
             "• get_google_doc_content('doc_id') - Read document\n"
+            "• apply_google_doc_edits('doc_id', edits) - Batch edit document\n"
             "• list_google_drive_files() - List all files\n\n"
             "📧 **Gmail (9 functions):**\n"
             "• list_gmail_messages() - Get recent emails\n"
@@ -1868,14 +2558,15 @@ class Tools:
         """List all available Google Workspace functions for the AI assistant."""
         return (
             "🤖 **AI Assistant: You have these Google Workspace tools available:**\n\n"
-            "📁 **Google Drive (7 functions):**\n"
+            "📁 **Google Drive (8 functions):**\n"
             "• show_my_drive_files(max_results=10)\n"
             "• search_my_drive(query, max_results=10)\n"
             "• search_google_drive(query, max_results=10)\n"
             "• list_google_drive_files(max_results=10)\n"
             "• create_google_doc(title, content='')\n"
             "• create_google_sheet(title, data=[])\n"
-            "• get_google_doc_content(document_id)\n\n"
+            "• get_google_doc_content(document_id)\n"
+            "• apply_google_doc_edits(document_id, edits)\n\n"
             "📧 **Gmail (9 functions):**\n"
             "• list_gmail_messages(max_results=10)\n"
             "• send_gmail(to_email, subject, body)\n"
@@ -1939,10 +2630,9 @@ class Tools:
             if not creds:
                 return "🔐 **Authentication Required**\n\nPlease call authenticate_google_workspace() first to set up Google access, then I can check your emails."
 
-            service = build("gmail", "v1", credentials=creds)
+            service = self._service(creds, "gmail", "v1")
             
             # Get today's date for search
-            import datetime
             today = datetime.date.today()
             today_str = today.strftime("%Y/%m/%d")
             
@@ -1950,8 +2640,9 @@ class Tools:
             results = service.users().messages().list(
                 userId="me", 
                 q=f"after:{today_str}",
-                maxResults=20
-            ).execute()
+                maxResults=20,
+                fields=_GMAIL_LIST_FIELDS,
+            ).execute(num_retries=_API_NUM_RETRIES)
             
             messages = results.get("messages", [])
             
@@ -1960,15 +2651,16 @@ class Tools:
 
             # Get details for today's messages
             message_list = []
-            for msg in messages[:10]:  # Limit to 10 most recent
-                msg_detail = service.users().messages().get(
-                    userId="me", id=msg["id"], format="metadata"
-                ).execute()
-                
+            message_ids = [msg["id"] for msg in messages[:10]]  # 10 most recent
+            for msg_detail in self._batch_get_messages(
+                service,
+                message_ids,
+                format="metadata",
+                metadataHeaders=_GMAIL_METADATA_HEADERS,
+                fields=_GMAIL_HEADER_FIELDS,
+            ):
                 headers = msg_detail["payload"].get("headers", [])
-                subject = next((h["value"] for h in headers if h["name"] == "Subject"), "No Subject")
-                sender = next((h["value"] for h in headers if h["name"] == "From"), "Unknown Sender")
-                date_header = next((h["value"] for h in headers if h["name"] == "Date"), "Unknown Date")
+                subject, sender, date_header = _message_headers(headers)
                 
                 message_list.append(f"📧 **{subject}**\n   From: {sender}\n   Date: {date_header}")
 
@@ -39,6 +39,7 @@ def test_tool_functions():
             "create_google_doc",
             "create_google_sheet",
             "get_google_doc_content",
+            "apply_google_doc_edits",
             # Gmail functions
             "list_gmail_messages",
             "send_gmail",